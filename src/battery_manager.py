@@ -3,29 +3,96 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import sqlite3
 import sys
-from dataclasses import dataclass, asdict
+import time
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
-GREEN = "\033[0;32m"
-RED   = "\033[0;31m"
-YELLOW= "\033[1;33m"
-CYAN  = "\033[0;36m"
-BLUE  = "\033[0;34m"
-BOLD  = "\033[1m"
-NC    = "\033[0m"
+try:
+    import orjson
+except ImportError:  # optional fast serializer
+    orjson = None
+
+# Colour only when writing to a terminal, honouring https://no-color.org.
+_USE_COLOR = sys.stdout.isatty() and not os.environ.get("NO_COLOR")
+
+GREEN = "\033[0;32m" if _USE_COLOR else ""
+RED = "\033[0;31m" if _USE_COLOR else ""
+YELLOW = "\033[1;33m" if _USE_COLOR else ""
+CYAN = "\033[0;36m" if _USE_COLOR else ""
+BLUE = "\033[0;34m" if _USE_COLOR else ""
+BOLD = "\033[1m" if _USE_COLOR else ""
+NC = "\033[0m" if _USE_COLOR else ""
 
 DB_PATH = Path.home() / ".blackroad" / "battery-manager.db"
 
+# Health buckets: pct < 15 critical, < 30 low, < 60 warning, otherwise healthy.
+_THRESHOLDS = (15, 30, 60)
+_LABELS = ("critical", "low", "warning", "healthy")
+
+_NS_PER_HOUR = 3_600_000_000_000
+
+
+def _health_label(pct: float) -> str:
+    return _LABELS[bisect_right(_THRESHOLDS, pct)]
+
+
+@lru_cache(maxsize=1024)
+def _iso_seconds(epoch_s: int) -> str:
+    """Local ISO-8601 timestamp, to the second, for a Unix time."""
+    return datetime.fromtimestamp(epoch_s).isoformat(timespec="seconds")
+
+
+# Alert levels below BatteryManager.CRITICAL_PCT / LOW_PCT (inclusive):
+# (device status, alert type, message format).
+_ALERT_LEVELS = (
+    ("critical", "critical", "CRITICAL: battery at {:.1f}%!"),
+    ("warning", "low_battery", "Battery low: {:.1f}%"),
+)
+
+# Public device columns, in IoTDevice field order.
+_DEVICE_COLUMNS = ("id, name, device_type, location, battery_type, battery_capacity_mah, "
+                   "current_pct, last_seen, status, firmware_version, notes, created_at")
+
+# Hot-path statements. Keeping the SQL text identical across call sites lets
+# the connection's statement cache reuse the prepared statements.
+_SQL_INSERT_DEVICE = """INSERT INTO iot_devices
+    (name, device_type, location, battery_type, battery_capacity_mah,
+     current_pct, last_seen, firmware_version, notes)
+    VALUES (?, ?, ?, ?, ?, 100.0, ?, ?, ?)
+    RETURNING id, created_at"""
+_SQL_GET_DEVICE = f"SELECT {_DEVICE_COLUMNS} FROM iot_devices WHERE id = ?"
+_SQL_GET_LAST_READING = "SELECT last_reading_pct, last_reading_epoch FROM iot_devices WHERE id = ?"
+_SQL_INSERT_READING = """INSERT INTO battery_readings
+    (device_id, reading_time, reading_time_epoch, battery_pct, voltage_mv,
+     temperature_c, signal_rssi, drain_rate)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)"""
+_SQL_UPDATE_DEVICE = ("UPDATE iot_devices SET current_pct=?, last_seen=?, status=?, "
+                      "last_reading_pct=?, last_reading_epoch=? WHERE id=?")
+_SQL_INSERT_ALERT = ("INSERT INTO battery_alerts "
+                     "(device_id, alert_type, threshold, current_value, message) "
+                     "VALUES (?, ?, ?, ?, ?)")
+_SQL_FLEET_STATUS = f"""SELECT COUNT(*), AVG(current_pct),
+           SUM(current_pct >= {_THRESHOLDS[2]}),
+           SUM(current_pct >= {_THRESHOLDS[1]} AND current_pct < {_THRESHOLDS[2]}),
+           SUM(current_pct >= {_THRESHOLDS[0]} AND current_pct < {_THRESHOLDS[1]}),
+           SUM(current_pct < {_THRESHOLDS[0]}),
+           (SELECT COUNT(*) FROM battery_alerts WHERE resolved=0)
+    FROM iot_devices"""
+
 
 # ---------------------------------------------------------------------------
 # Data models
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class IoTDevice:
     id: Optional[int]
     name: str
@@ -41,10 +108,7 @@ class IoTDevice:
     created_at: Optional[str] = None
 
     def health_label(self) -> str:
-        if self.current_pct >= 60: return "healthy"
-        if self.current_pct >= 30: return "warning"
-        if self.current_pct >= 15: return "low"
-        return "critical"
+        return _health_label(self.current_pct)
 
     def days_remaining(self, daily_drain_pct: float = 2.0) -> Optional[float]:
         if daily_drain_pct <= 0:
@@ -52,7 +116,7 @@ class IoTDevice:
         return round(self.current_pct / daily_drain_pct, 1)
 
 
-@dataclass
+@dataclass(slots=True)
 class BatteryReading:
     id: Optional[int]
     device_id: int
@@ -64,7 +128,7 @@ class BatteryReading:
     drain_rate: Optional[float]   # % per hour
 
 
-@dataclass
+@dataclass(slots=True)
 class BatteryAlert:
     id: Optional[int]
     device_id: int
@@ -89,208 +153,420 @@ class BatteryManager:
     def __init__(self, db_path: Path = DB_PATH) -> None:
         self.db_path = db_path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._alert_bounds = (self.CRITICAL_PCT, self.LOW_PCT)
+        # One long-lived connection in autocommit mode; writes are grouped
+        # explicitly via _transaction().
+        self.conn = sqlite3.connect(self.db_path, isolation_level=None,
+                                    check_same_thread=False, cached_statements=128)
+        self.conn.row_factory = sqlite3.Row
+        # page_size only applies to a new, empty database, so it must come
+        # before journal_mode=WAL writes the file header.
+        self.conn.execute("PRAGMA page_size=8192")
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-32000")
+        self.conn.execute("PRAGMA mmap_size=268435456")
         self._init_db()
 
+    def close(self) -> None:
+        """Refresh planner statistics and close the database connection."""
+        self.conn.execute("PRAGMA optimize")
+        self.conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
     def _init_db(self) -> None:
-        with sqlite3.connect(self.db_path) as conn:
-            conn.executescript("""
-                CREATE TABLE IF NOT EXISTS iot_devices (
-                    id                   INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name                 TEXT NOT NULL UNIQUE,
-                    device_type          TEXT NOT NULL,
-                    location             TEXT NOT NULL DEFAULT 'unknown',
-                    battery_type         TEXT NOT NULL DEFAULT 'LiPo',
-                    battery_capacity_mah INTEGER NOT NULL DEFAULT 2000,
-                    current_pct          REAL NOT NULL DEFAULT 100.0,
-                    last_seen            TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    status               TEXT NOT NULL DEFAULT 'online',
-                    firmware_version     TEXT DEFAULT '1.0.0',
-                    notes                TEXT DEFAULT '',
-                    created_at           TEXT DEFAULT CURRENT_TIMESTAMP
-                );
-                CREATE TABLE IF NOT EXISTS battery_readings (
-                    id            INTEGER PRIMARY KEY AUTOINCREMENT,
-                    device_id     INTEGER REFERENCES iot_devices(id) ON DELETE CASCADE,
-                    reading_time  TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    battery_pct   REAL NOT NULL,
-                    voltage_mv    REAL,
-                    temperature_c REAL,
-                    signal_rssi   INTEGER,
-                    drain_rate    REAL
-                );
-                CREATE TABLE IF NOT EXISTS battery_alerts (
-                    id            INTEGER PRIMARY KEY AUTOINCREMENT,
-                    device_id     INTEGER REFERENCES iot_devices(id),
-                    alert_type    TEXT NOT NULL,
-                    threshold     REAL NOT NULL,
-                    current_value REAL NOT NULL,
-                    message       TEXT NOT NULL,
-                    resolved      INTEGER NOT NULL DEFAULT 0,
-                    created_at    TEXT DEFAULT CURRENT_TIMESTAMP
-                );
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS iot_devices (
+                id                   INTEGER PRIMARY KEY AUTOINCREMENT,
+                name                 TEXT NOT NULL UNIQUE,
+                device_type          TEXT NOT NULL,
+                location             TEXT NOT NULL DEFAULT 'unknown',
+                battery_type         TEXT NOT NULL DEFAULT 'LiPo',
+                battery_capacity_mah INTEGER NOT NULL DEFAULT 2000,
+                current_pct          REAL NOT NULL DEFAULT 100.0,
+                last_seen            TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                status               TEXT NOT NULL DEFAULT 'online',
+                firmware_version     TEXT DEFAULT '1.0.0',
+                notes                TEXT DEFAULT '',
+                created_at           TEXT DEFAULT CURRENT_TIMESTAMP,
+                last_reading_pct     REAL,
+                last_reading_epoch   INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS battery_readings (
+                id            INTEGER PRIMARY KEY AUTOINCREMENT,
+                device_id     INTEGER REFERENCES iot_devices(id) ON DELETE CASCADE,
+                reading_time  TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                reading_time_epoch INTEGER,   -- nanoseconds since the Unix epoch
+                battery_pct   REAL NOT NULL,
+                voltage_mv    REAL,
+                temperature_c REAL,
+                signal_rssi   INTEGER,
+                drain_rate    REAL
+            );
+            CREATE TABLE IF NOT EXISTS battery_alerts (
+                id            INTEGER PRIMARY KEY AUTOINCREMENT,
+                device_id     INTEGER REFERENCES iot_devices(id),
+                alert_type    TEXT NOT NULL,
+                threshold     REAL NOT NULL,
+                current_value REAL NOT NULL,
+                message       TEXT NOT NULL,
+                resolved      INTEGER NOT NULL DEFAULT 0,
+                created_at    TEXT DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE INDEX IF NOT EXISTS idx_devices_status_pct
+                ON iot_devices(status, current_pct);
+            CREATE INDEX IF NOT EXISTS idx_alerts_resolved
+                ON battery_alerts(resolved) WHERE resolved = 0;
+        """)
+
+        def migrated() -> tuple[bool, set[str], set[str]]:
+            dev = {r[1] for r in self.conn.execute("PRAGMA table_info(iot_devices)")}
+            read = {r[1] for r in self.conn.execute("PRAGMA table_info(battery_readings)")}
+            return "last_reading_epoch" in dev and "reading_time_epoch" in read, dev, read
+
+        if migrated()[0]:
+            return
+        # Older databases: add the epoch/last-reading columns and backfill them.
+        # Re-check under the write lock, as another process may have got there first.
+        with self._transaction() as conn:
+            done, dev_cols, read_cols = migrated()
+            if done:
+                return
+            if "reading_time_epoch" not in read_cols:
+                conn.execute("ALTER TABLE battery_readings ADD COLUMN reading_time_epoch INTEGER")
+                conn.execute("""
+                    UPDATE battery_readings SET reading_time_epoch =
+                        CAST(ROUND((julianday(reading_time, 'utc') - 2440587.5) * 86400000)
+                             AS INTEGER) * 1000000
+                """)
+            if "last_reading_pct" not in dev_cols:
+                conn.execute("ALTER TABLE iot_devices ADD COLUMN last_reading_pct REAL")
+            if "last_reading_epoch" not in dev_cols:
+                conn.execute("ALTER TABLE iot_devices ADD COLUMN last_reading_epoch INTEGER")
+            # Temporary index for the per-device subqueries below; nothing on
+            # the hot path reads it, so it is dropped once the backfill is done.
+            conn.execute("CREATE INDEX idx_readings_backfill "
+                         "ON battery_readings(device_id, reading_time_epoch)")
+            conn.execute("""
+                UPDATE iot_devices SET
+                    last_reading_pct   = (SELECT battery_pct FROM battery_readings r
+                                          WHERE r.device_id = iot_devices.id
+                                          ORDER BY reading_time_epoch DESC LIMIT 1),
+                    last_reading_epoch = (SELECT MAX(reading_time_epoch) FROM battery_readings r
+                                          WHERE r.device_id = iot_devices.id)
             """)
+            conn.execute("DROP INDEX idx_readings_backfill")
 
     def add_device(self, name: str, device_type: str, location: str,
                    battery_type: str = "LiPo", capacity_mah: int = 2000,
                    firmware: str = "1.0.0", notes: str = "") -> IoTDevice:
         """Register a new IoT device for battery monitoring."""
-        ts = datetime.now().isoformat()
-        with sqlite3.connect(self.db_path) as conn:
-            cur = conn.execute(
-                """INSERT INTO iot_devices
-                   (name, device_type, location, battery_type, battery_capacity_mah,
-                    current_pct, last_seen, firmware_version, notes)
-                   VALUES (?, ?, ?, ?, ?, 100.0, ?, ?, ?)""",
+        ts = _iso_seconds(int(time.time()))
+        with self._transaction() as conn:
+            device_id, created_at = conn.execute(
+                _SQL_INSERT_DEVICE,
                 (name, device_type, location, battery_type, capacity_mah, ts, firmware, notes),
-            )
-            conn.commit()
-        return self._get_device(cur.lastrowid)
+            ).fetchone()
+        return IoTDevice(id=device_id, name=name, device_type=device_type,
+                         location=location, battery_type=battery_type,
+                         battery_capacity_mah=capacity_mah, current_pct=100.0,
+                         last_seen=ts, status="online", firmware_version=firmware,
+                         notes=notes, created_at=created_at)
 
     def _get_device(self, device_id: int) -> Optional[IoTDevice]:
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            row = conn.execute(
-                "SELECT * FROM iot_devices WHERE id = ?", (device_id,)
-            ).fetchone()
-        return IoTDevice(**dict(row)) if row else None
+        row = self.conn.execute(_SQL_GET_DEVICE, (device_id,)).fetchone()
+        return IoTDevice(*row) if row else None
 
     def record_reading(self, device_id: int, battery_pct: float,
                        voltage_mv: Optional[float] = None,
                        temperature_c: Optional[float] = None,
                        signal_rssi: Optional[int] = None) -> BatteryReading:
-        """Log battery telemetry, compute drain rate, update device state."""
-        ts = datetime.now().isoformat()
+        """Log battery telemetry, compute drain rate, update device state.
+
+        Raises ValueError if ``device_id`` is not a registered device.
+        """
+        now_ns = time.time_ns()
+        ts = _iso_seconds(now_ns // 1_000_000_000)
         drain_rate: Optional[float] = None
-        with sqlite3.connect(self.db_path) as conn:
-            prev = conn.execute(
-                "SELECT battery_pct, reading_time FROM battery_readings "
-                "WHERE device_id = ? ORDER BY reading_time DESC LIMIT 1",
-                (device_id,),
-            ).fetchone()
-            if prev:
-                try:
-                    elapsed_h = (datetime.fromisoformat(ts) -
-                                 datetime.fromisoformat(prev[1])).total_seconds() / 3600
-                    if elapsed_h > 0:
-                        drain_rate = round((prev[0] - battery_pct) / elapsed_h, 4)
-                except ValueError:
-                    pass
-            new_status = ("critical" if battery_pct <= self.CRITICAL_PCT
-                          else "warning" if battery_pct <= self.LOW_PCT else "online")
+        with self._transaction() as conn:
+            # One primary-key read gives both the previous reading and
+            # confirmation that the device exists.
+            prev = conn.execute(_SQL_GET_LAST_READING, (device_id,)).fetchone()
+            if prev is None:
+                raise ValueError(f"Unknown device id: {device_id}")
+            if prev[1] is not None and now_ns > prev[1]:
+                drain_rate = round((prev[0] - battery_pct) * _NS_PER_HOUR / (now_ns - prev[1]), 4)
+            new_status, alert = self._classify(device_id, battery_pct)
             cur = conn.execute(
-                """INSERT INTO battery_readings
-                   (device_id, reading_time, battery_pct, voltage_mv, temperature_c,
-                    signal_rssi, drain_rate)
-                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                (device_id, ts, battery_pct, voltage_mv, temperature_c,
+                _SQL_INSERT_READING,
+                (device_id, ts, now_ns, battery_pct, voltage_mv, temperature_c,
                  signal_rssi, drain_rate),
             )
             conn.execute(
-                "UPDATE iot_devices SET current_pct=?, last_seen=?, status=? WHERE id=?",
-                (battery_pct, ts, new_status, device_id),
+                _SQL_UPDATE_DEVICE,
+                (battery_pct, ts, new_status, battery_pct, now_ns, device_id),
             )
-            conn.commit()
-        self._check_alerts(device_id, battery_pct)
+            if alert:
+                self._fire_alert(*alert, conn=conn)
         return BatteryReading(id=cur.lastrowid, device_id=device_id,
                               reading_time=ts, battery_pct=battery_pct,
                               voltage_mv=voltage_mv, temperature_c=temperature_c,
                               signal_rssi=signal_rssi, drain_rate=drain_rate)
 
-    def _check_alerts(self, device_id: int, pct: float) -> None:
-        if pct <= self.CRITICAL_PCT:
-            self._fire_alert(device_id, "critical",   self.CRITICAL_PCT, pct,
-                             f"CRITICAL: battery at {pct:.1f}%!")
-        elif pct <= self.LOW_PCT:
-            self._fire_alert(device_id, "low_battery", self.LOW_PCT, pct,
-                             f"Battery low: {pct:.1f}%")
+    def record_readings(self, readings: list[dict]) -> list[BatteryReading]:
+        """Log many telemetry readings in a single transaction.
+
+        Each item needs ``device_id`` and ``battery_pct``; ``voltage_mv``,
+        ``temperature_c``, ``signal_rssi`` and ``reading_time`` are optional.
+        Readings for the same device are applied in the order given. A reading
+        older than the device's last one is stored but does not move its state
+        (current_pct, last_seen, status) back in time or raise an alert.
+        Raises ValueError, recording nothing, if any device id is unknown.
+        """
+        if not readings:
+            return []
+        now_ns = time.time_ns()
+        ts = _iso_seconds(now_ns // 1_000_000_000)
+        ids = sorted({r["device_id"] for r in readings})
+        marks = ",".join("?" * len(ids))
+        result: list[BatteryReading] = []
+        rows, alerts = [], []
+        latest: dict[int, tuple] = {}
+        with self._transaction() as conn:
+            prev = {r[0]: (r[1], r[2]) for r in conn.execute(
+                "SELECT id, last_reading_pct, last_reading_epoch FROM iot_devices "
+                f"WHERE id IN ({marks})", ids)}
+            missing = [i for i in ids if i not in prev]
+            if missing:
+                raise ValueError(f"Unknown device id(s): {', '.join(map(str, missing))}")
+            for r in readings:
+                device_id, pct = r["device_id"], float(r["battery_pct"])
+                if r.get("reading_time"):
+                    # Store the same local, second-resolution form as other rows.
+                    rns = int(datetime.fromisoformat(r["reading_time"]).timestamp() * 1e9)
+                    rts = _iso_seconds(rns // 1_000_000_000)
+                else:
+                    rts, rns = ts, now_ns
+                drain_rate: Optional[float] = None
+                prev_pct, prev_ns = prev[device_id]
+                advances = prev_ns is None or rns >= prev_ns
+                if prev_ns is not None and rns > prev_ns:
+                    drain_rate = round((prev_pct - pct) * _NS_PER_HOUR / (rns - prev_ns), 4)
+                reading = BatteryReading(id=None, device_id=device_id, reading_time=rts,
+                                         battery_pct=pct, voltage_mv=r.get("voltage_mv"),
+                                         temperature_c=r.get("temperature_c"),
+                                         signal_rssi=r.get("signal_rssi"),
+                                         drain_rate=drain_rate)
+                result.append(reading)
+                rows.append((device_id, rts, rns, pct, reading.voltage_mv,
+                             reading.temperature_c, reading.signal_rssi, drain_rate))
+                if not advances:
+                    continue
+                prev[device_id] = (pct, rns)
+                new_status, alert = self._classify(device_id, pct)
+                latest[device_id] = (pct, rts, new_status, pct, rns, device_id)
+                if alert:
+                    alerts.append(alert)
+            conn.executemany(_SQL_INSERT_READING, rows)
+            # AUTOINCREMENT ids are contiguous while we hold the write lock.
+            last_id = conn.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'battery_readings'"
+            ).fetchone()[0]
+            if latest:
+                conn.executemany(_SQL_UPDATE_DEVICE, latest.values())
+            if alerts:
+                conn.executemany(_SQL_INSERT_ALERT, alerts)
+        for i, reading in enumerate(result, start=last_id - len(result) + 1):
+            reading.id = i
+        return result
+
+    def _classify(self, device_id: int, pct: float) -> tuple[str, Optional[tuple]]:
+        """Return the device status for ``pct`` and the alert row it raises, if any."""
+        level = bisect_left(self._alert_bounds, pct)
+        if level == len(_ALERT_LEVELS):
+            return "online", None
+        status, atype, fmt = _ALERT_LEVELS[level]
+        return status, (device_id, atype, self._alert_bounds[level], pct, fmt.format(pct))
+
+    def _check_alerts(self, device_id: int, pct: float,
+                      conn: Optional[sqlite3.Connection] = None) -> None:
+        _, alert = self._classify(device_id, pct)
+        if alert:
+            self._fire_alert(*alert, conn=conn)
 
     def _fire_alert(self, device_id: int, atype: str, threshold: float,
-                    current: float, message: str) -> None:
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "INSERT INTO battery_alerts "
-                "(device_id, alert_type, threshold, current_value, message) "
-                "VALUES (?, ?, ?, ?, ?)",
-                (device_id, atype, threshold, current, message),
-            )
-            conn.commit()
+                    current: float, message: str,
+                    conn: Optional[sqlite3.Connection] = None) -> None:
+        """Insert an alert, inside the caller's transaction when ``conn`` is given."""
+        if conn is not None:
+            conn.execute(_SQL_INSERT_ALERT, (device_id, atype, threshold, current, message))
+            return
+        with self._transaction() as conn:
+            conn.execute(_SQL_INSERT_ALERT, (device_id, atype, threshold, current, message))
+
+    def iter_devices(self, status: Optional[str] = None) -> Iterator[IoTDevice]:
+        """Yield monitored IoT devices one at a time, lowest battery first."""
+        q, params = f"SELECT {_DEVICE_COLUMNS} FROM iot_devices", []
+        if status:
+            q += " WHERE status = ?"; params.append(status)
+        q += " ORDER BY current_pct ASC"
+        for row in self.conn.execute(q, params):
+            yield IoTDevice(*row)
 
     def list_devices(self, status: Optional[str] = None) -> list[IoTDevice]:
         """Retrieve all monitored IoT devices, sorted by battery level (lowest first)."""
-        q, params = "SELECT * FROM iot_devices", []
+        return list(self.iter_devices(status))
+
+    def count_devices(self, status: Optional[str] = None) -> int:
+        """Count monitored IoT devices, optionally filtered by status."""
         if status:
-            q += " WHERE status = ?"; params.append(status)
-        q += " ORDER BY current_pct ASC"
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            rows = conn.execute(q, params).fetchall()
-        return [IoTDevice(**dict(r)) for r in rows]
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM iot_devices WHERE status = ?", (status,)
+            ).fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM iot_devices").fetchone()[0]
 
     def fleet_status(self) -> dict:
         """Aggregate battery health across the IoT fleet."""
-        devices = self.list_devices()
-        total   = len(devices)
-        with sqlite3.connect(self.db_path) as conn:
-            alerts = conn.execute(
-                "SELECT COUNT(*) FROM battery_alerts WHERE resolved=0"
-            ).fetchone()[0]
-        avg = round(sum(d.current_pct for d in devices) / total, 1) if total else 0.0
+        row = self.conn.execute(_SQL_FLEET_STATUS).fetchone()
+        total = row[0]
         return {
             "total_devices": total,
-            "avg_battery_pct": avg,
-            "healthy":  sum(1 for d in devices if d.current_pct >= 60),
-            "warning":  sum(1 for d in devices if 30 <= d.current_pct < 60),
-            "low":      sum(1 for d in devices if 15 <= d.current_pct < 30),
-            "critical": sum(1 for d in devices if d.current_pct < 15),
-            "active_alerts": alerts,
+            "avg_battery_pct": round(row[1], 1) if total else 0.0,
+            "healthy":  row[2] or 0,
+            "warning":  row[3] or 0,
+            "low":      row[4] or 0,
+            "critical": row[5] or 0,
+            "active_alerts": row[6],
         }
 
     def export_json(self, output_path: str = "battery_export.json") -> str:
-        """Export fleet battery status to JSON."""
-        devices = self.list_devices()
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            alerts = [dict(r) for r in conn.execute(
-                "SELECT * FROM battery_alerts WHERE resolved=0 ORDER BY created_at DESC"
-            ).fetchall()]
-        payload = {
-            "exported_at":  datetime.now().isoformat(),
-            "fleet_status": self.fleet_status(),
-            "devices":      [asdict(d) for d in devices],
-            "active_alerts": alerts,
-        }
-        with open(output_path, "w") as fh:
-            json.dump(payload, fh, indent=2)
+        """Export fleet battery status to JSON, streaming rows straight to disk."""
+        devices = self.conn.execute(
+            f"SELECT {_DEVICE_COLUMNS} FROM iot_devices ORDER BY current_pct ASC")
+        alerts = self.conn.execute(
+            "SELECT * FROM battery_alerts WHERE resolved=0 ORDER BY created_at DESC")
+        with open(output_path, "wb") as fh:
+            fh.write(b'{\n  "exported_at": ')
+            fh.write(_dumps(_iso_seconds(int(time.time()))))
+            fh.write(b',\n  "fleet_status": ')
+            fh.write(_dumps(self.fleet_status()))
+            fh.write(b',\n  "devices": ')
+            _write_array(fh, devices)
+            fh.write(b',\n  "active_alerts": ')
+            _write_array(fh, alerts)
+            fh.write(b"\n}\n")
         return output_path
 
 
+if orjson:
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, default=str)
+else:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, default=str).encode()
+
+
+def _write_array(fh, rows: Iterable[sqlite3.Row]) -> None:
+    """Write rows to a binary file as a JSON array, one object per line."""
+    first = sep = b"[\n    "
+    for row in rows:
+        fh.write(sep)
+        fh.write(_dumps(dict(row)))
+        sep = b",\n    "
+    fh.write(b"[]" if sep is first else b"\n  ]")
+
+
 # ---------------------------------------------------------------------------
 # Display helpers
 # ---------------------------------------------------------------------------
 
+_BAR_WIDTH_MAX = 64
+_FULL = "█" * _BAR_WIDTH_MAX
+_EMPTY = "░" * _BAR_WIDTH_MAX
+# "<icon> <color>" prefix for each whole percent 0..100.
+_BAR_PREFIX = tuple(
+    f"{'🔋' if p >= 30 else '🪫'} {GREEN if p >= 60 else (YELLOW if p >= 30 else RED)}"
+    for p in range(101)
+)
+
+
 def _batt_bar(pct: float, width: int = 12) -> str:
-    filled = int(min(pct, 100) / 100 * width)
-    color  = GREEN if pct >= 60 else (YELLOW if pct >= 30 else RED)
-    icon   = "🔋" if pct >= 30 else "🪫"
-    return f"{icon} {color}{'█' * filled}{'░' * (width - filled)}{NC} {pct:5.1f}%"
-
-
-def _print_device(d: IoTDevice) -> None:
-    sc = {"online": GREEN, "offline": RED, "warning": YELLOW, "critical": RED}.get(d.status, NC)
-    print(f"  {BOLD}[{d.id:>3}]{NC} {CYAN}{d.name}{NC}  {BLUE}({d.device_type}){NC}  📍{d.location}")
-    print(f"        Battery  : {_batt_bar(d.current_pct)}")
-    print(f"        Status   : {sc}{d.status}{NC}   "
-          f"Type: {d.battery_type}   Cap: {d.battery_capacity_mah} mAh")
-    print(f"        Last seen: {d.last_seen[:19]}   FW: {d.firmware_version}")
+    filled = max(int(min(pct, 100) / 100 * width), 0)
+    prefix = _BAR_PREFIX[min(max(int(pct), 0), 100)]
+    if width > _BAR_WIDTH_MAX:
+        return f"{prefix}{'█' * filled}{'░' * (width - filled)}{NC} {pct:5.1f}%"
+    return f"{prefix}{_FULL[:filled]}{_EMPTY[:width - filled]}{NC} {pct:5.1f}%"
+
+
+_STATUS_COLORS = {"online": GREEN, "offline": RED, "warning": YELLOW, "critical": RED}
+_WRITE_BATCH = 128
+
+
+def _format_device(d: IoTDevice) -> str:
+    """Render one device block, including its trailing blank line."""
+    sc = _STATUS_COLORS.get(d.status, NC)
+    lines = [
+        f"  {BOLD}[{d.id:>3}]{NC} {CYAN}{d.name}{NC}  {BLUE}({d.device_type}){NC}  📍{d.location}",
+        f"        Battery  : {_batt_bar(d.current_pct)}",
+        f"        Status   : {sc}{d.status}{NC}   "
+        f"Type: {d.battery_type}   Cap: {d.battery_capacity_mah} mAh",
+        f"        Last seen: {d.last_seen[:19]}   FW: {d.firmware_version}",
+    ]
     if d.notes:
-        print(f"        Notes    : {d.notes}")
-    print()
+        lines.append(f"        Notes    : {d.notes}")
+    lines.append("\n")
+    return "\n".join(lines)
+
+
+def _write_devices(devices: Iterable[IoTDevice]) -> None:
+    """Write device blocks to stdout, flushing every _WRITE_BATCH devices."""
+    chunks: list[str] = []
+    for d in devices:
+        chunks.append(_format_device(d))
+        if len(chunks) >= _WRITE_BATCH:
+            sys.stdout.write("".join(chunks))
+            chunks.clear()
+    if chunks:
+        sys.stdout.write("".join(chunks))
 
 
 # ---------------------------------------------------------------------------
 # CLI
 # ---------------------------------------------------------------------------
 
+def _load_readings(path: str) -> list[dict]:
+    """Parse a JSON-lines readings file, raising ValueError that names the bad line."""
+    batch = []
+    with open(path) as fh:
+        for lineno, line in enumerate(fh, start=1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+                if not isinstance(item, dict):
+                    raise ValueError("expected a JSON object")
+                item["device_id"] = int(item["device_id"])
+                item["battery_pct"] = float(item["battery_pct"])
+                if item.get("reading_time"):
+                    datetime.fromisoformat(item["reading_time"])
+            except KeyError as exc:
+                raise ValueError(f"line {lineno}: missing field {exc}") from None
+            except (TypeError, ValueError) as exc:
+                raise ValueError(f"line {lineno}: {exc}") from None
+            batch.append(item)
+    return batch
+
+
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(
         prog="battery_manager",
@@ -317,6 +593,10 @@ def build_parser() -> argparse.ArgumentParser:
     rp.add_argument("--temp",      type=float, default=None, dest="temperature_c")
     rp.add_argument("--rssi",      type=int,   default=None, dest="signal_rssi")
 
+    bp = sub.add_parser("reading-batch", help="Record readings from a JSON-lines file")
+    bp.add_argument("--file", required=True, dest="path",
+                    help="one JSON object per line (device_id, battery_pct, ...)")
+
     sub.add_parser("status", help="Show fleet battery summary")
 
     ep = sub.add_parser("export", help="Export fleet data to JSON")
@@ -330,52 +610,69 @@ def main() -> None:
     args   = parser.parse_args()
     mgr    = BatteryManager()
     print(f"\n{BOLD}{BLUE}╔══ BlackRoad Battery Manager ══╗{NC}\n")
-
-    if args.cmd == "list":
-        devices = mgr.list_devices(status=getattr(args, "status", None))
-        if not devices:
-            print(f"  {YELLOW}No devices registered.{NC}\n"); return
-        print(f"  {BOLD}IoT Fleet ({len(devices)} devices){NC}\n")
-        for d in devices:
-            _print_device(d)
-
-    elif args.cmd == "add":
-        dev = mgr.add_device(args.name, args.device_type, args.location,
-                             args.battery_type, args.capacity_mah,
-                             args.firmware, args.notes)
-        print(f"  {GREEN}✓ Device registered: [{dev.id}] {dev.name}{NC}\n")
-
-    elif args.cmd == "reading":
-        r   = mgr.record_reading(args.device_id, args.battery_pct,
-                                  args.voltage_mv, args.temperature_c, args.signal_rssi)
-        dev = mgr._get_device(args.device_id)
-        hlc = GREEN if dev and dev.health_label() == "healthy" else               (YELLOW if dev and dev.health_label() == "warning" else RED)
-        print(f"  {GREEN}✓ Reading logged: {args.battery_pct:.1f}%{NC}")
-        print(f"  Battery: {_batt_bar(args.battery_pct)}   "
-              f"Health: {hlc}{dev.health_label() if dev else '?'}{NC}")
-        if r.drain_rate is not None:
-            print(f"  Drain rate: {r.drain_rate:.3f} %/hr")
-        print()
-
-    elif args.cmd == "status":
-        s = mgr.fleet_status()
-        print(f"  {BOLD}IoT Fleet Battery Status{NC}")
-        print(f"  {'Total Devices':<24} {CYAN}{s['total_devices']}{NC}")
-        print(f"  {'Average Battery':<24} {_batt_bar(s['avg_battery_pct'])}")
-        print(f"  {'Healthy  (≥60%)':<24} {GREEN}{s['healthy']}{NC}")
-        print(f"  {'Warning (30–60%)':<24} {YELLOW}{s['warning']}{NC}")
-        print(f"  {'Low    (15–30%)':<24} {YELLOW}{s['low']}{NC}")
-        print(f"  {'Critical (<15%)':<24} {RED}{s['critical']}{NC}")
-        print(f"  {'Active Alerts':<24} "
-              f"{RED if s['active_alerts'] else GREEN}{s['active_alerts']}{NC}")
-        print()
-
-    elif args.cmd == "export":
-        path = mgr.export_json(args.output)
-        print(f"  {GREEN}✓ Exported to: {path}{NC}\n")
-
-    else:
-        parser.print_help(); print()
+    try:
+        if args.cmd == "list":
+            status = getattr(args, "status", None)
+            total = mgr.count_devices(status)
+            if not total:
+                print(f"  {YELLOW}No devices registered.{NC}\n"); return
+            print(f"  {BOLD}IoT Fleet ({total} devices){NC}\n")
+            _write_devices(mgr.iter_devices(status))
+
+        elif args.cmd == "add":
+            dev = mgr.add_device(args.name, args.device_type, args.location,
+                                 args.battery_type, args.capacity_mah,
+                                 args.firmware, args.notes)
+            print(f"  {GREEN}✓ Device registered: [{dev.id}] {dev.name}{NC}\n")
+
+        elif args.cmd == "reading":
+            try:
+                r = mgr.record_reading(args.device_id, args.battery_pct,
+                                       args.voltage_mv, args.temperature_c, args.signal_rssi)
+            except ValueError as exc:
+                print(f"  {RED}✗ {exc}{NC}\n")
+                return
+            # The device's current_pct is now this reading, so its health
+            # label follows from the reading alone.
+            health = _health_label(r.battery_pct)
+            hlc = GREEN if health == "healthy" else (YELLOW if health == "warning" else RED)
+            print(f"  {GREEN}✓ Reading logged: {args.battery_pct:.1f}%{NC}")
+            print(f"  Battery: {_batt_bar(args.battery_pct)}   "
+                  f"Health: {hlc}{health}{NC}")
+            if r.drain_rate is not None:
+                print(f"  Drain rate: {r.drain_rate:.3f} %/hr")
+            print()
+
+        elif args.cmd == "reading-batch":
+            try:
+                readings = mgr.record_readings(_load_readings(args.path))
+            except (OSError, ValueError) as exc:
+                print(f"  {RED}✗ {exc}{NC}\n")
+                return
+            devices = len({r.device_id for r in readings})
+            print(f"  {GREEN}✓ Logged {len(readings)} readings across {devices} devices{NC}\n")
+
+        elif args.cmd == "status":
+            s = mgr.fleet_status()
+            print(f"  {BOLD}IoT Fleet Battery Status{NC}")
+            print(f"  {'Total Devices':<24} {CYAN}{s['total_devices']}{NC}")
+            print(f"  {'Average Battery':<24} {_batt_bar(s['avg_battery_pct'])}")
+            print(f"  {'Healthy  (≥60%)':<24} {GREEN}{s['healthy']}{NC}")
+            print(f"  {'Warning (30–60%)':<24} {YELLOW}{s['warning']}{NC}")
+            print(f"  {'Low    (15–30%)':<24} {YELLOW}{s['low']}{NC}")
+            print(f"  {'Critical (<15%)':<24} {RED}{s['critical']}{NC}")
+            print(f"  {'Active Alerts':<24} "
+                  f"{RED if s['active_alerts'] else GREEN}{s['active_alerts']}{NC}")
+            print()
+
+        elif args.cmd == "export":
+            path = mgr.export_json(args.output)
+            print(f"  {GREEN}✓ Exported to: {path}{NC}\n")
+
+        else:
+            parser.print_help(); print()
+    finally:
+        mgr.close()
 
 
 if __name__ == "__main__":
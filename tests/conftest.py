@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import battery_manager  # noqa: E402
+
+
+@pytest.fixture
+def mgr(tmp_path):
+    m = battery_manager.BatteryManager(tmp_path / "battery.db")
+    yield m
+    m.close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze time.time_ns() as seen by battery_manager; advance with clock.tick()."""
+    class Clock:
+        now_ns = 1_700_000_000 * 10**9
+
+        def tick(self, seconds: float) -> None:
+            self.now_ns += int(seconds * 10**9)
+
+    c = Clock()
+    monkeypatch.setattr(battery_manager.time, "time_ns", lambda: c.now_ns)
+    return c
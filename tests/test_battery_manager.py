@@ -0,0 +1,247 @@
+import importlib
+import json
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+import battery_manager
+from battery_manager import BatteryManager
+
+# Schema as created by the original release, before the epoch and
+# last-reading columns existed.
+BASELINE_SCHEMA = """
+    CREATE TABLE iot_devices (
+        id                   INTEGER PRIMARY KEY AUTOINCREMENT,
+        name                 TEXT NOT NULL UNIQUE,
+        device_type          TEXT NOT NULL,
+        location             TEXT NOT NULL DEFAULT 'unknown',
+        battery_type         TEXT NOT NULL DEFAULT 'LiPo',
+        battery_capacity_mah INTEGER NOT NULL DEFAULT 2000,
+        current_pct          REAL NOT NULL DEFAULT 100.0,
+        last_seen            TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        status               TEXT NOT NULL DEFAULT 'online',
+        firmware_version     TEXT DEFAULT '1.0.0',
+        notes                TEXT DEFAULT '',
+        created_at           TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE battery_readings (
+        id            INTEGER PRIMARY KEY AUTOINCREMENT,
+        device_id     INTEGER REFERENCES iot_devices(id) ON DELETE CASCADE,
+        reading_time  TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        battery_pct   REAL NOT NULL,
+        voltage_mv    REAL,
+        temperature_c REAL,
+        signal_rssi   INTEGER,
+        drain_rate    REAL
+    );
+    CREATE TABLE battery_alerts (
+        id            INTEGER PRIMARY KEY AUTOINCREMENT,
+        device_id     INTEGER REFERENCES iot_devices(id),
+        alert_type    TEXT NOT NULL,
+        threshold     REAL NOT NULL,
+        current_value REAL NOT NULL,
+        message       TEXT NOT NULL,
+        resolved      INTEGER NOT NULL DEFAULT 0,
+        created_at    TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+
+def _epoch_ns(iso: str) -> int:
+    return int(datetime.fromisoformat(iso).timestamp()) * 10**9
+
+
+def _count(mgr, table: str) -> int:
+    return mgr.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_baseline_database_is_migrated(tmp_path):
+    db = tmp_path / "old.db"
+    times = ["2024-05-01T10:00:00", "2024-05-01T12:00:00"]
+    with sqlite3.connect(db) as conn:
+        conn.executescript(BASELINE_SCHEMA)
+        conn.execute("INSERT INTO iot_devices (name, device_type, current_pct) "
+                     "VALUES ('a', 'sensor', 70.0)")
+        conn.execute("INSERT INTO iot_devices (name, device_type) VALUES ('b', 'sensor')")
+        conn.executemany("INSERT INTO battery_readings (device_id, reading_time, battery_pct) "
+                         "VALUES (1, ?, ?)", [(times[0], 90.0), (times[1], 70.0)])
+
+    mgr = BatteryManager(db)
+    try:
+        epochs = [r[0] for r in mgr.conn.execute(
+            "SELECT reading_time_epoch FROM battery_readings ORDER BY id")]
+        assert epochs == [_epoch_ns(t) for t in times]
+        rows = mgr.conn.execute(
+            "SELECT last_reading_pct, last_reading_epoch FROM iot_devices ORDER BY id").fetchall()
+        assert tuple(rows[0]) == (70.0, _epoch_ns(times[1]))
+        assert tuple(rows[1]) == (None, None)
+        indexes = {r[1] for r in mgr.conn.execute("PRAGMA index_list(battery_readings)")}
+        assert "idx_readings_backfill" not in indexes
+    finally:
+        mgr.close()
+
+    # Re-opening a migrated database is a no-op.
+    BatteryManager(db).close()
+
+
+def test_concurrent_migration_is_not_repeated(tmp_path, monkeypatch):
+    db = tmp_path / "old.db"
+    with sqlite3.connect(db) as conn:
+        conn.executescript(BASELINE_SCHEMA)
+    transaction = BatteryManager._transaction
+    raced = []
+
+    def migrate_elsewhere_first(self):
+        # Another process migrates between our column check and BEGIN IMMEDIATE.
+        if not raced:
+            raced.append(True)
+            BatteryManager(db).close()
+        return transaction(self)
+
+    monkeypatch.setattr(BatteryManager, "_transaction", migrate_elsewhere_first)
+    BatteryManager(db).close()
+    assert raced
+
+
+def test_single_and_batch_drain_rates_agree(mgr, clock):
+    a = mgr.add_device("a", "sensor", "lab")
+    b = mgr.add_device("b", "sensor", "lab")
+
+    assert mgr.record_reading(a.id, 90.0).drain_rate is None
+    clock.tick(3600)
+    assert mgr.record_reading(a.id, 80.0).drain_rate == pytest.approx(10.0)
+
+    mgr.record_readings([{"device_id": b.id, "battery_pct": 90.0}])
+    clock.tick(3600)
+    [r] = mgr.record_readings([{"device_id": b.id, "battery_pct": 80.0}])
+    assert r.drain_rate == pytest.approx(10.0)
+
+    # Explicit reading times within one batch chain off each other.
+    base = datetime.fromtimestamp(clock.now_ns // 10**9)
+    later = [base + timedelta(hours=h) for h in (1, 3)]
+    readings = mgr.record_readings([
+        {"device_id": b.id, "battery_pct": 70.0, "reading_time": later[0].isoformat()},
+        {"device_id": b.id, "battery_pct": 60.0, "reading_time": later[1].isoformat()},
+    ])
+    assert readings[1].drain_rate == pytest.approx(5.0)
+
+
+def test_older_batch_reading_does_not_rewind_device(mgr, clock):
+    dev = mgr.add_device("a", "sensor", "lab")
+    mgr.record_reading(dev.id, 90.0)
+    [old] = mgr.record_readings([
+        {"device_id": dev.id, "battery_pct": 5.0, "reading_time": "2020-01-01T00:00:00"},
+    ])
+    assert old.drain_rate is None
+    assert mgr._get_device(dev.id).current_pct == 90.0
+    assert mgr.fleet_status()["active_alerts"] == 0
+    clock.tick(3600)
+    assert mgr.record_reading(dev.id, 88.0).drain_rate == pytest.approx(2.0)
+
+
+def test_unknown_device_rolls_back(mgr):
+    dev = mgr.add_device("a", "sensor", "lab")
+    with pytest.raises(ValueError):
+        mgr.record_reading(999, 5.0)
+    with pytest.raises(ValueError):
+        mgr.record_readings([{"device_id": dev.id, "battery_pct": 5.0},
+                             {"device_id": 999, "battery_pct": 5.0}])
+    assert _count(mgr, "battery_readings") == 0
+    assert _count(mgr, "battery_alerts") == 0
+    assert mgr._get_device(dev.id).current_pct == 100.0
+
+
+def test_returned_reading_ids_match_stored_rows(mgr):
+    a = mgr.add_device("a", "sensor", "lab")
+    b = mgr.add_device("b", "sensor", "lab")
+    returned = [mgr.record_reading(a.id, 95.0)]
+    returned += mgr.record_readings([
+        {"device_id": a.id, "battery_pct": 90.0},
+        {"device_id": b.id, "battery_pct": 85.0},
+        {"device_id": a.id, "battery_pct": 80.0},
+    ])
+    returned.append(mgr.record_reading(b.id, 75.0))
+
+    stored = {r[0]: (r[1], r[2]) for r in mgr.conn.execute(
+        "SELECT id, device_id, battery_pct FROM battery_readings")}
+    assert len({r.id for r in returned}) == len(returned) == len(stored)
+    for r in returned:
+        assert stored[r.id] == (r.device_id, r.battery_pct)
+
+
+def test_batch_reading_time_is_stored_normalised(mgr):
+    dev = mgr.add_device("a", "sensor", "lab")
+    given = "2026-10-15T18:00:00+00:00"
+    expected = datetime.fromtimestamp(_epoch_ns(given) // 10**9).isoformat(timespec="seconds")
+    [r] = mgr.record_readings([{"device_id": dev.id, "battery_pct": 80.0, "reading_time": given}])
+    assert r.reading_time == expected
+    stored = mgr.conn.execute("SELECT reading_time, reading_time_epoch FROM battery_readings").fetchone()
+    assert tuple(stored) == (expected, _epoch_ns(given))
+    assert mgr._get_device(dev.id).last_seen == expected
+
+
+def test_add_device_returns_stored_created_at(mgr):
+    dev = mgr.add_device("a", "sensor", "lab")
+    assert dev == mgr._get_device(dev.id)
+    # Column default: UTC "YYYY-MM-DD HH:MM:SS", as before add_device stopped re-reading.
+    datetime.strptime(dev.created_at, "%Y-%m-%d %H:%M:%S")
+
+
+@pytest.mark.parametrize("pct, label", [
+    (14.9, "critical"), (15, "low"), (29.9, "low"), (30, "warning"),
+    (59.9, "warning"), (60, "healthy"),
+])
+def test_health_label_boundaries(pct, label):
+    assert battery_manager._health_label(pct) == label
+
+
+@pytest.mark.parametrize("pct, status, alert_type", [
+    (15, "critical", "critical"), (15.1, "warning", "low_battery"),
+    (30, "warning", "low_battery"), (30.1, "online", None), (60, "online", None),
+])
+def test_classify_boundaries(mgr, pct, status, alert_type):
+    got_status, alert = mgr._classify(1, pct)
+    assert got_status == status
+    assert (alert[1] if alert else None) == alert_type
+
+@pytest.fixture(params=["orjson", "json"])
+def serializer(request, monkeypatch):
+    """Run once with orjson and once with the stdlib _dumps fallback."""
+    if request.param == "json":
+        monkeypatch.setitem(sys.modules, "orjson", None)
+        importlib.reload(battery_manager)
+        assert battery_manager.orjson is None
+    yield request.param
+    if request.param == "json":
+        monkeypatch.undo()
+        importlib.reload(battery_manager)
+
+
+def test_export_empty_fleet_is_valid_json(serializer, tmp_path):
+    mgr = battery_manager.BatteryManager(tmp_path / "battery.db")
+    try:
+        with open(mgr.export_json(str(tmp_path / "export.json"))) as fh:
+            data = json.load(fh)
+    finally:
+        mgr.close()
+    assert data["devices"] == [] and data["active_alerts"] == []
+    assert data["fleet_status"]["total_devices"] == 0
+
+
+def test_export_populated_fleet_is_valid_json(serializer, tmp_path):
+    mgr = battery_manager.BatteryManager(tmp_path / "battery.db")
+    try:
+        a = mgr.add_device("a", "sensor", "lab")
+        b = mgr.add_device("b", "gateway", "roof")
+        mgr.record_reading(a.id, 80.0)
+        mgr.record_reading(b.id, 10.0)
+        with open(mgr.export_json(str(tmp_path / "export.json"))) as fh:
+            data = json.load(fh)
+    finally:
+        mgr.close()
+    assert [d["name"] for d in data["devices"]] == ["b", "a"]
+    assert data["devices"][0]["status"] == "critical"
+    assert [al["device_id"] for al in data["active_alerts"]] == [b.id]
+    assert data["fleet_status"]["total_devices"] == 2